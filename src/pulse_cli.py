@@ -1,28 +1,215 @@
+import os
 import time
 import sys
+import argparse
 import random
 import math
 import threading
+import gzip
+import html
+import collections
+import asyncio
+import urllib.request
+import urllib.parse
 from prometheus_client import start_http_server, Gauge, generate_latest
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from prometheus_client.parser import text_string_to_metric_families
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 
 # Prometheus Metrics
 GPU_UTIL = Gauge('gpu_utilization_percent', 'GPU SM Utilization', ['gpu_index', 'gpu_name'])
 MEM_UTIL = Gauge('gpu_memory_utilization_percent', 'GPU Memory Controller Utilization', ['gpu_index', 'gpu_name'])
 MEM_USED = Gauge('gpu_memory_used_gb', 'GPU Memory Used (GB)', ['gpu_index', 'gpu_name'])
+MEM_TOTAL = Gauge('gpu_memory_total_gb', 'GPU Memory Total (GB)', ['gpu_index', 'gpu_name'])
 POWER_WATTS = Gauge('gpu_power_watts', 'GPU Power Usage (W)', ['gpu_index', 'gpu_name'])
 PCIE_TX = Gauge('gpu_pcie_tx_mb', 'GPU PCIe Transmit (MB/s)', ['gpu_index', 'gpu_name'])
 PCIE_RX = Gauge('gpu_pcie_rx_mb', 'GPU PCIe Receive (MB/s)', ['gpu_index', 'gpu_name'])
+POWER_PEAK = Gauge('gpu_power_peak_watts', 'GPU Peak Power Since Last Sample (W)', ['gpu_index', 'gpu_name'])
 
-# Global state for the simple UI
-LATEST_METRICS = []
+# GPM metrics, only exported for Hopper and newer GPUs
+SM_ACTIVE = Gauge('gpu_sm_active_percent', 'GPU SM Active (GPM)', ['gpu_index', 'gpu_name'])
+SM_OCCUPANCY = Gauge('gpu_sm_occupancy_percent', 'GPU SM Occupancy (GPM)', ['gpu_index', 'gpu_name'])
+DRAM_ACTIVE = Gauge('gpu_dram_active_percent', 'GPU DRAM Bandwidth Utilization (GPM)', ['gpu_index', 'gpu_name'])
+TENSOR_ACTIVE = Gauge('gpu_tensor_active_percent', 'GPU Tensor Pipe Active (GPM)', ['gpu_index', 'gpu_name'])
+FP64_ACTIVE = Gauge('gpu_fp64_active_percent', 'GPU FP64 Pipe Active (GPM)', ['gpu_index', 'gpu_name'])
+FP32_ACTIVE = Gauge('gpu_fp32_active_percent', 'GPU FP32 Pipe Active (GPM)', ['gpu_index', 'gpu_name'])
+FP16_ACTIVE = Gauge('gpu_fp16_active_percent', 'GPU FP16 Pipe Active (GPM)', ['gpu_index', 'gpu_name'])
+GPM_PCIE_TX = Gauge('gpu_pcie_tx_gpm_mb', 'GPU PCIe Transmit (GPM, MiB/s)', ['gpu_index', 'gpu_name'])
+GPM_PCIE_RX = Gauge('gpu_pcie_rx_gpm_mb', 'GPU PCIe Receive (GPM, MiB/s)', ['gpu_index', 'gpu_name'])
+NVLINK_TX = Gauge('gpu_nvlink_tx_mb', 'GPU NVLink Transmit, All Links (GPM, MiB/s)', ['gpu_index', 'gpu_name'])
+NVLINK_RX = Gauge('gpu_nvlink_rx_mb', 'GPU NVLink Receive, All Links (GPM, MiB/s)', ['gpu_index', 'gpu_name'])
+
+# Metrics dict key -> gauge it is exported through
+GAUGES = {
+    'gpu_util': GPU_UTIL,
+    'mem_util': MEM_UTIL,
+    'mem_used': MEM_USED,
+    'mem_total': MEM_TOTAL,
+    'power_watts': POWER_WATTS,
+    'power_peak_watts': POWER_PEAK,
+    'pcie_tx': PCIE_TX,
+    'pcie_rx': PCIE_RX,
+}
+
+GPM_GAUGES = {
+    'sm_active': SM_ACTIVE,
+    'sm_occupancy': SM_OCCUPANCY,
+    'dram_active': DRAM_ACTIVE,
+    'tensor_active': TENSOR_ACTIVE,
+    'fp64_active': FP64_ACTIVE,
+    'fp32_active': FP32_ACTIVE,
+    'fp16_active': FP16_ACTIVE,
+    'gpm_pcie_tx': GPM_PCIE_TX,
+    'gpm_pcie_rx': GPM_PCIE_RX,
+    'nvlink_tx': NVLINK_TX,
+    'nvlink_rx': NVLINK_RX,
+}
+
+# Exported metric name -> metrics dict key, for reading remote gpu-pulse exporters
+REMOTE_KEYS = {
+    gauge.describe()[0].name: key
+    for key, gauge in dict(GAUGES, **GPM_GAUGES).items()
+}
+
+# Keys a remote GPU must report to be shown on the dashboard and CLI
+REMOTE_REQUIRED = ('gpu_util', 'mem_util', 'mem_used', 'mem_total', 'power_watts', 'pcie_tx', 'pcie_rx')
+
+# Latest sampled metrics, shared with the UI. The sampler thread swaps in a new
+# (version, metrics list, /metrics exposition bytes) tuple each tick; readers
+# take whatever is in the slot.
+_SNAPSHOT = [(0, [], b'')]
+
+# The CLI is only drawn on a terminal; under systemd or with redirected stdout
+# nobody sees it and the escape codes would only bloat the journal
+_TTY = sys.stdout.isatty()
+
+# CLI lines drawn in the previous frame, so only changed rows are redrawn
+_PREV_LINES = []
+
+# CLI frame templates; each GPU block is formatted once and split into rows
+_CLI_HEADER = "--- GPU Pulse (Mode: %s) ---"
+_CLI_GPU_TMPL = (
+    "\nGPU [%d]: %s"
+    "\n  ├── 🧠 SM Util:      %3d%%"
+    "\n  ├── 💾 Mem Util:     %3d%%"
+    "\n  └── ⚡ Power:        %.0f W"
+)
+
+# GPUs from remote exporters, swapped in by the remote polling thread and
+# merged into each local snapshot
+_REMOTE_BATCH = [[]]
+
+# Compressed response bodies per path: (snapshot version, gzip bytes)
+_GZIP_CACHE = {}
 
 # Try importing pynvml; if missing, we'll use Mock Mode
 try:
-    from pynvml import *
+    from pynvml import (
+        nvmlInit, nvmlShutdown, nvmlDeviceGetCount, nvmlDeviceGetHandleByIndex,
+        nvmlDeviceGetName, nvmlDeviceSetPersistenceMode, nvmlDeviceGetUtilizationRates,
+        nvmlDeviceGetMemoryInfo, nvmlDeviceGetPowerUsage, nvmlDeviceGetPcieThroughput,
+        nvmlDeviceGetFieldValues, nvmlDeviceGetSamples,
+        NVMLError, NVMLError_NotFound, NVMLError_NotSupported, NVMLError_InvalidArgument,
+        NVML_SUCCESS, NVML_ERROR_NOT_SUPPORTED, NVML_ERROR_INVALID_ARGUMENT, NVML_FEATURE_ENABLED,
+        NVML_PCIE_UTIL_TX_BYTES, NVML_PCIE_UTIL_RX_BYTES,
+        NVML_TOTAL_POWER_SAMPLES, NVML_GPU_UTILIZATION_SAMPLES, NVML_MEMORY_UTILIZATION_SAMPLES,
+        NVML_VALUE_TYPE_DOUBLE, NVML_VALUE_TYPE_UNSIGNED_INT, NVML_VALUE_TYPE_UNSIGNED_LONG,
+        NVML_VALUE_TYPE_UNSIGNED_LONG_LONG, NVML_VALUE_TYPE_SIGNED_LONG_LONG,
+    )
     HAS_NVML = True
+
+    # Field IDs for the batched power/PCIe read need a recent pynvml
+    try:
+        from pynvml import (
+            NVML_FI_DEV_POWER_INSTANT, NVML_FI_DEV_PCIE_COUNT_TX_BYTES,
+            NVML_FI_DEV_PCIE_COUNT_RX_BYTES,
+        )
+        HAS_FIELD_VALUES = True
+
+        # Fields read with a single nvmlDeviceGetFieldValues call per device.
+        # Utilization and memory have no field equivalent and keep their own calls.
+        FIELD_IDS = [
+            NVML_FI_DEV_POWER_INSTANT,
+            NVML_FI_DEV_PCIE_COUNT_TX_BYTES,
+            NVML_FI_DEV_PCIE_COUNT_RX_BYTES,
+        ]
+    except ImportError:
+        HAS_FIELD_VALUES = False
+
+    _VALUE_ATTRS = {
+        NVML_VALUE_TYPE_DOUBLE: 'dVal',
+        NVML_VALUE_TYPE_UNSIGNED_INT: 'uiVal',
+        NVML_VALUE_TYPE_UNSIGNED_LONG: 'ulVal',
+        NVML_VALUE_TYPE_UNSIGNED_LONG_LONG: 'ullVal',
+        NVML_VALUE_TYPE_SIGNED_LONG_LONG: 'sllVal',
+    }
+    # Value types (and union members) only present in newer pynvml
+    try:
+        from pynvml import NVML_VALUE_TYPE_SIGNED_INT, NVML_VALUE_TYPE_UNSIGNED_SHORT
+        _VALUE_ATTRS[NVML_VALUE_TYPE_SIGNED_INT] = 'siVal'
+        _VALUE_ATTRS[NVML_VALUE_TYPE_UNSIGNED_SHORT] = 'usVal'
+    except ImportError:
+        pass
+
+    # GPU Performance Monitoring (Hopper and newer) needs a recent pynvml
+    try:
+        from pynvml import (
+            nvmlGpmQueryDeviceSupport, nvmlGpmSampleAlloc, nvmlGpmSampleGet,
+            nvmlGpmSampleFree, nvmlGpmMetricsGet, c_nvmlGpmMetricsGet_t,
+            NVML_GPM_METRICS_GET_VERSION,
+            NVML_GPM_METRIC_SM_UTIL, NVML_GPM_METRIC_SM_OCCUPANCY,
+            NVML_GPM_METRIC_DRAM_BW_UTIL, NVML_GPM_METRIC_ANY_TENSOR_UTIL,
+            NVML_GPM_METRIC_FP64_UTIL, NVML_GPM_METRIC_FP32_UTIL, NVML_GPM_METRIC_FP16_UTIL,
+            NVML_GPM_METRIC_PCIE_TX_PER_SEC, NVML_GPM_METRIC_PCIE_RX_PER_SEC,
+            NVML_GPM_METRIC_NVLINK_TOTAL_TX_PER_SEC, NVML_GPM_METRIC_NVLINK_TOTAL_RX_PER_SEC,
+        )
+        HAS_GPM = True
+
+        # Metrics dict key -> GPM metric, all fetched in one nvmlGpmMetricsGet call
+        GPM_METRICS = [
+            ('sm_active', NVML_GPM_METRIC_SM_UTIL),
+            ('sm_occupancy', NVML_GPM_METRIC_SM_OCCUPANCY),
+            ('dram_active', NVML_GPM_METRIC_DRAM_BW_UTIL),
+            ('tensor_active', NVML_GPM_METRIC_ANY_TENSOR_UTIL),
+            ('fp64_active', NVML_GPM_METRIC_FP64_UTIL),
+            ('fp32_active', NVML_GPM_METRIC_FP32_UTIL),
+            ('fp16_active', NVML_GPM_METRIC_FP16_UTIL),
+            ('gpm_pcie_tx', NVML_GPM_METRIC_PCIE_TX_PER_SEC),
+            ('gpm_pcie_rx', NVML_GPM_METRIC_PCIE_RX_PER_SEC),
+            ('nvlink_tx', NVML_GPM_METRIC_NVLINK_TOTAL_TX_PER_SEC),
+            ('nvlink_rx', NVML_GPM_METRIC_NVLINK_TOTAL_RX_PER_SEC),
+        ]
+    except ImportError:
+        HAS_GPM = False
 except ImportError:
     HAS_NVML = False
+    HAS_FIELD_VALUES = False
+    HAS_GPM = False
+
+# NumPy is optional; it only speeds up Mock Mode with many simulated GPUs
+try:
+    import numpy as np
+    HAS_NUMPY = True
+    _RNG = np.random.default_rng()
+except ImportError:
+    HAS_NUMPY = False
+
+# Phase offset (radians) between simulated GPUs so they don't move in lockstep
+MOCK_PHASE_STEP = 0.5
+
+# Last PCIe byte counters per GPU index: (timestamp_us, tx_bytes, rx_bytes)
+_PCIE_COUNTERS = {}
+
+# Last nvmlDeviceGetPcieThroughput reading per GPU index: (tx, rx) in MB/s
+_PCIE_THROUGHPUT = {}
+
+# Timestamp of the newest driver sample seen per (GPU index, sampling type)
+_LAST_SAMPLE_TS = {}
+
+# GPM sample pair per GPM-capable GPU index: [previous, next]
+_GPM_SAMPLES = {}
+
+# NVML queries that returned NOT_SUPPORTED, per GPU index; never retried
+_UNSUPPORTED = collections.defaultdict(set)
 
 def check_nvidia_driver():
     """Verify that NVML can be initialized. Returns False if mock mode needed."""
@@ -30,37 +217,228 @@ def check_nvidia_driver():
         return False
     try:
         nvmlInit()
-        return True
     except NVMLError:
         return False
+    enable_persistence_mode()
+    return True
+
+def enable_persistence_mode():
+    """Keep the driver loaded between NVML calls (needs root or CAP_SYS_ADMIN)."""
+    try:
+        for i in range(nvmlDeviceGetCount()):
+            handle = nvmlDeviceGetHandleByIndex(i)
+            nvmlDeviceSetPersistenceMode(handle, NVML_FEATURE_ENABLED)
+    except NVMLError as e:
+        print(f"⚠️  Could not enable persistence mode ({e}); "
+              "run as root or start nvidia-persistenced for faster NVML calls.")
+
+def nvml_value(value_type, value):
+    """Unpack an NVML value union according to its reported type."""
+    return getattr(value, _VALUE_ATTRS[value_type])
+
+def query_supported(index, query, func, *args):
+    """Call an NVML function unless `query` is already known to be unsupported.
+
+    Returns None when the GPU doesn't support it. The first NOT_SUPPORTED is
+    remembered, so an unsupported query costs one failed call per process
+    instead of one exception per tick.
+    """
+    if query in _UNSUPPORTED[index]:
+        return None
+    try:
+        return func(*args)
+    except NVMLError_NotSupported:
+        _UNSUPPORTED[index].add(query)
+        return None
+
+def read_field_values(index, handle, poll_slow=True, want_power=True):
+    """Read power and PCIe throughput with one batched NVML call.
+
+    Fields the driver fails to read (unsupported, or unknown to an older
+    driver) fall back to their individual calls, as does everything when
+    pynvml predates these field IDs. A batch the driver rejects outright is
+    not retried; other failures fall back for that tick only. PCIe
+    throughput is derived from the byte counters of consecutive ticks, so
+    the first tick (or a counter wrap) also uses the fallback.
+    The PCIe fallback samples a 20ms window per direction, so it is only
+    queried when `poll_slow` is set; other ticks reuse its last reading.
+    Power is left as None without `want_power`. Values the GPU can't report
+    at all come back as NaN.
+    """
+    power = tx = rx = None
+    fields = None
+    if HAS_FIELD_VALUES:
+        field_ids = FIELD_IDS if want_power else FIELD_IDS[1:]
+        try:
+            fields = query_supported(index, 'field_values', nvmlDeviceGetFieldValues, handle, field_ids)
+        except NVMLError_InvalidArgument:
+            # Driver doesn't know these field IDs; it never will
+            _UNSUPPORTED[index].add('field_values')
+        except NVMLError:
+            # Possibly transient (timeout, GPU reset); use the individual calls this tick only
+            pass
+    if fields:
+        if all(f.nvmlReturn in (NVML_ERROR_NOT_SUPPORTED, NVML_ERROR_INVALID_ARGUMENT) for f in fields):
+            _UNSUPPORTED[index].add('field_values')
+        *power_f, tx_f, rx_f = fields
+
+        if power_f and power_f[0].nvmlReturn == NVML_SUCCESS:
+            power = nvml_value(power_f[0].valueType, power_f[0].value) / 1000.0
+
+    if power is None and want_power:
+        milliwatts = query_supported(index, 'power', nvmlDeviceGetPowerUsage, handle)
+        power = math.nan if milliwatts is None else milliwatts / 1000.0
+
+    if fields and tx_f.nvmlReturn == NVML_SUCCESS and rx_f.nvmlReturn == NVML_SUCCESS:
+        current = (tx_f.timestamp,
+                   nvml_value(tx_f.valueType, tx_f.value),
+                   nvml_value(rx_f.valueType, rx_f.value))
+        previous = _PCIE_COUNTERS.get(index)
+        _PCIE_COUNTERS[index] = current
+        if previous:
+            elapsed = (current[0] - previous[0]) / 1e6
+            d_tx = current[1] - previous[1]
+            d_rx = current[2] - previous[2]
+            if elapsed > 0 and d_tx >= 0 and d_rx >= 0:
+                tx = d_tx / elapsed / 1024**2
+                rx = d_rx / elapsed / 1024**2
+
+    if tx is None:
+        if poll_slow or index not in _PCIE_THROUGHPUT:
+            # PCIe throughput (TX/RX) sampled by the driver, in KB/s
+            tx_kb = query_supported(index, 'pcie', nvmlDeviceGetPcieThroughput, handle, NVML_PCIE_UTIL_TX_BYTES)
+            rx_kb = query_supported(index, 'pcie', nvmlDeviceGetPcieThroughput, handle, NVML_PCIE_UTIL_RX_BYTES)
+            if tx_kb is None or rx_kb is None:
+                _PCIE_THROUGHPUT[index] = (math.nan, math.nan)
+            else:
+                _PCIE_THROUGHPUT[index] = (tx_kb / 1024.0, rx_kb / 1024.0)
+        tx, rx = _PCIE_THROUGHPUT[index]
+
+    return power, tx, rx
+
+def read_samples(index, handle, sampling_type):
+    """Return the values the driver buffered since the previous call.
 
-def get_real_metrics(handle):
+    Empty when there is nothing new or the GPU doesn't support the
+    sampling type, in which case callers use an instantaneous read. The
+    first call only sets the cursor: whatever the driver buffered before
+    we started isn't this process's first interval.
+    """
+    key = (index, sampling_type)
+    priming = key not in _LAST_SAMPLE_TS
+    try:
+        result = query_supported(index, ('samples', sampling_type), nvmlDeviceGetSamples,
+                                 handle, sampling_type, _LAST_SAMPLE_TS.get(key, 0))
+    except NVMLError_NotFound:
+        # Empty buffer; everything from here on is new
+        _LAST_SAMPLE_TS.setdefault(key, 0)
+        return []
+    if result is None:
+        return []
+    value_type, samples = result
+    if samples:
+        # NVML doesn't promise the samples are ordered
+        _LAST_SAMPLE_TS[key] = max(sample.timeStamp for sample in samples)
+    if priming:
+        _LAST_SAMPLE_TS.setdefault(key, 0)
+        return []
+    return [nvml_value(value_type, sample.sampleValue) for sample in samples]
+
+def setup_gpm(index, handle):
+    """Take a baseline GPM sample if the GPU supports GPM (Hopper and newer)."""
+    if not HAS_GPM:
+        return
+    try:
+        if not nvmlGpmQueryDeviceSupport(handle).isSupportedDevice:
+            return
+        previous, current = nvmlGpmSampleAlloc(), nvmlGpmSampleAlloc()
+        nvmlGpmSampleGet(handle, previous)
+    except NVMLError:
+        return
+    _GPM_SAMPLES[index] = [previous, current]
+
+def free_gpm_samples():
+    """Release the GPM sample buffers; call before nvmlShutdown."""
+    for pair in _GPM_SAMPLES.values():
+        for sample in pair:
+            try:
+                nvmlGpmSampleFree(sample)
+            except NVMLError:
+                pass
+    _GPM_SAMPLES.clear()
+
+def read_gpm_metrics(index, handle):
+    """Read every GPM metric between the previous tick's sample and now."""
+    pair = _GPM_SAMPLES.get(index)
+    if not pair or 'gpm' in _UNSUPPORTED[index]:
+        return {}
+    previous, current = pair
+    try:
+        nvmlGpmSampleGet(handle, current)
+        request = c_nvmlGpmMetricsGet_t()
+        request.version = NVML_GPM_METRICS_GET_VERSION
+        request.numMetrics = len(GPM_METRICS)
+        request.sample1 = previous
+        request.sample2 = current
+        for i, (_, metric_id) in enumerate(GPM_METRICS):
+            request.metrics[i].metricId = metric_id
+        nvmlGpmMetricsGet(request)
+    except NVMLError_NotSupported:
+        _UNSUPPORTED[index].add('gpm')
+        return {}
+    except NVMLError:
+        return {}
+    # The sample just taken is the baseline for the next tick
+    pair.reverse()
+    return {
+        key: request.metrics[i].value
+        for i, (key, _) in enumerate(GPM_METRICS)
+        if request.metrics[i].nvmlReturn == NVML_SUCCESS
+    }
+
+def get_real_metrics(index, handle, poll_slow=True):
     """Fetch real metrics from physical GPU."""
     try:
-        util = nvmlDeviceGetUtilizationRates(handle)
         mem_info = nvmlDeviceGetMemoryInfo(handle)
-        power = nvmlDeviceGetPowerUsage(handle) / 1000.0
-        
-        # PCIe throughput (TX/RX)
-        tx = nvmlDeviceGetPcieThroughput(handle, NVML_PCIE_UTIL_TX_BYTES) / 1024.0
-        rx = nvmlDeviceGetPcieThroughput(handle, NVML_PCIE_UTIL_RX_BYTES) / 1024.0
-
-        return {
-            "gpu_util": util.gpu,
-            "mem_util": util.memory,
+
+        # Summarize everything the driver sampled between polls, not just the latest value
+        power_samples = read_samples(index, handle, NVML_TOTAL_POWER_SAMPLES)
+        # Instantaneous power is only needed when there are no samples to summarize
+        power, tx, rx = read_field_values(index, handle, poll_slow, want_power=not power_samples)
+        if power_samples:
+            power = sum(power_samples) / len(power_samples) / 1000.0
+            power_peak = max(power_samples) / 1000.0
+        else:
+            power_peak = power
+
+        gpu_samples = read_samples(index, handle, NVML_GPU_UTILIZATION_SAMPLES)
+        mem_samples = read_samples(index, handle, NVML_MEMORY_UTILIZATION_SAMPLES) if gpu_samples else []
+        if gpu_samples and mem_samples:
+            gpu_util = round(sum(gpu_samples) / len(gpu_samples))
+            mem_util = round(sum(mem_samples) / len(mem_samples))
+        else:
+            util = nvmlDeviceGetUtilizationRates(handle)
+            gpu_util, mem_util = util.gpu, util.memory
+
+        metrics = {
+            "gpu_util": gpu_util,
+            "mem_util": mem_util,
             "mem_used": mem_info.used / 1024**3,
             "mem_total": mem_info.total / 1024**3,
             "power_watts": power,
+            "power_peak_watts": power_peak,
             "pcie_tx": tx,
             "pcie_rx": rx
         }
+        metrics.update(read_gpm_metrics(index, handle))
+        return metrics
     except NVMLError:
         return None
 
 def get_mock_metrics(index, tick):
     """Generate realistic fake metrics for testing without a GPU."""
     # Simulate a training workload (sine wave)
-    load = (math.sin(tick * 0.5) + 1) / 2  # 0.0 to 1.0
+    load = (math.sin(tick * 0.5 + index * MOCK_PHASE_STEP) + 1) / 2  # 0.0 to 1.0
     
     return {
         "gpu_util": int(load * 95) + random.randint(-2, 2),
@@ -68,66 +446,95 @@ def get_mock_metrics(index, tick):
         "mem_used": 40 + (load * 20), # 40-60GB used
         "mem_total": 80.0,            # H100 80GB
         "power_watts": 100 + (load * 600), # 100-700W
+        "power_peak_watts": 100 + (load * 650),
         "pcie_tx": 2000 + (load * 1000),
         "pcie_rx": 4000 + (load * 2000)
     }
 
-class DashboardHandler(BaseHTTPRequestHandler):
-    def do_GET(self):
-        if self.path == '/metrics':
-            self.send_response(200)
-            self.send_header('Content-type', 'text/plain')
-            self.end_headers()
-            self.wfile.write(generate_latest())
-        elif self.path == '/':
-            self.send_response(200)
-            self.send_header('Content-type', 'text/html')
-            self.end_headers()
-            self.wfile.write(self.get_html().encode('utf-8'))
-        else:
-            self.send_response(404)
-            self.end_headers()
+def get_mock_batch(count, tick):
+    """Generate mock metrics for `count` simulated GPUs in one vectorized pass."""
+    if not HAS_NUMPY:
+        return [get_mock_metrics(i, tick) for i in range(count)]
 
-    def get_html(self):
-        # Simple HTML Dashboard with auto-refresh
-        rows = ""
-        for m in LATEST_METRICS:
-            # Color coding for utilization
-            util_color = "red" if m['gpu_util'] > 90 else "green" if m['gpu_util'] < 50 else "orange"
-            
-            rows += f"""
-            <div class="gpu-card">
-                <h2>{m['name']} <span class="index">#{m['index']}</span></h2>
-                <div class="metric-row">
-                    <div class="metric">
-                        <span class="label">Compute (SM)</span>
-                        <div class="bar-container">
-                            <div class="bar" style="width: {m['gpu_util']}%; background-color: {util_color};"></div>
-                        </div>
-                        <span class="value">{m['gpu_util']}%</span>
-                    </div>
-                    <div class="metric">
-                        <span class="label">Memory BW</span>
-                        <div class="bar-container">
-                            <div class="bar" style="width: {m['mem_util']}%; background-color: #3498db;"></div>
-                        </div>
-                        <span class="value">{m['mem_util']}%</span>
-                    </div>
-                </div>
-                <div class="details">
-                    <p>💾 VRAM: <b>{m['mem_used']:.1f}</b> / {m['mem_total']:.1f} GB</p>
-                    <p>⚡ Power: <b>{m['power_watts']:.0f} W</b></p>
-                    <p>↔️ PCIe: TX {m['pcie_tx']:.0f} MB/s | RX {m['pcie_rx']:.0f} MB/s</p>
-                </div>
-            </div>
-            """
-        
-        return f"""
+    load = (np.sin(tick * 0.5 + np.arange(count) * MOCK_PHASE_STEP) + 1) / 2
+    gpu_util = (load * 95).astype(np.int64) + _RNG.integers(-2, 3, size=count)
+    mem_util = (load * 80).astype(np.int64) + _RNG.integers(-5, 6, size=count)
+    columns = zip(
+        gpu_util.tolist(),
+        mem_util.tolist(),
+        (40 + load * 20).tolist(),
+        (100 + load * 600).tolist(),
+        (100 + load * 650).tolist(),
+        (2000 + load * 1000).tolist(),
+        (4000 + load * 2000).tolist(),
+    )
+    return [
+        {
+            "gpu_util": gu,
+            "mem_util": mu,
+            "mem_used": used,
+            "mem_total": 80.0,
+            "power_watts": power,
+            "power_peak_watts": peak,
+            "pcie_tx": tx,
+            "pcie_rx": rx
+        }
+        for gu, mu, used, power, peak, tx, rx in columns
+    ]
+
+# Remote names end up on the terminal; drop C0 controls and DEL
+_CONTROL_CHARS = dict.fromkeys([*range(0x20), 0x7f])
+
+def parse_remote_metrics(host, text):
+    """Turn a remote exporter's /metrics text into per-GPU metrics dicts."""
+    gpus = {}
+    for family in text_string_to_metric_families(text):
+        key = REMOTE_KEYS.get(family.name)
+        if key is None:
+            continue
+        for sample in family.samples:
+            gpu = gpus.setdefault((sample.labels['gpu_index'], sample.labels['gpu_name']), {})
+            gpu[key] = sample.value
+
+    batch = []
+    for (index, name), metrics in sorted(gpus.items()):
+        if not all(key in metrics for key in REMOTE_REQUIRED):
+            continue
+        metrics['gpu_util'] = round(metrics['gpu_util'])
+        metrics['mem_util'] = round(metrics['mem_util'])
+        metrics['name'] = f"{name} @ {host}".translate(_CONTROL_CHARS)
+        metrics['index'] = int(index)
+        batch.append(metrics)
+    return batch
+
+def http_get(url, timeout):
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        return response.read().decode('utf-8')
+
+async def fetch_remote(endpoint, timeout):
+    text = await asyncio.to_thread(http_get, endpoint, timeout)
+    return parse_remote_metrics(urllib.parse.urlsplit(endpoint).netloc, text)
+
+async def fetch_all_remote(endpoints, timeout):
+    """Scrape every remote exporter concurrently; unreachable hosts are skipped."""
+    results = await asyncio.gather(
+        *(fetch_remote(endpoint, timeout) for endpoint in endpoints),
+        return_exceptions=True,
+    )
+    batch = []
+    for result in results:
+        if not isinstance(result, Exception):
+            batch.extend(result)
+    return batch
+
+# Static dashboard chrome, formatted with the refresh period once at startup;
+# only the GPU cards change per request
+HTML_HEADER = """
         <html>
         <head>
             <meta charset="utf-8">
             <title>GPU Pulse Dashboard</title>
-            <meta http-equiv="refresh" content="1">
+            <meta http-equiv="refresh" content="{refresh}">
             <style>
                 body {{ font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, Helvetica, Arial, sans-serif; background: #1a1a1a; color: #ecf0f1; padding: 20px; }}
                 h1 {{ text-align: center; color: #e74c3c; }}
@@ -148,80 +555,309 @@ class DashboardHandler(BaseHTTPRequestHandler):
         <body>
             <h1>🔥 GPU Pulse Monitor</h1>
             <div class="container">
-                {rows}
+"""
+
+HTML_FOOTER = """
             </div>
-            <p style="text-align: center; margin-top: 20px; color: #7f8c8d;">Auto-refreshing every 1s • <a href="/metrics" style="color: #3498db;">Prometheus Metrics</a></p>
+            <p style="text-align: center; margin-top: 20px; color: #7f8c8d;">Auto-refreshing every {refresh}s • <a href="/metrics" style="color: #3498db;">Prometheus Metrics</a></p>
         </body>
         </html>
-        """
+"""
+
+# Per-GPU card, filled from a metrics dict plus its 'util_color'
+_CARD_TEMPLATE = """
+            <div class="gpu-card">
+                <h2>{name} <span class="index">#{index}</span></h2>
+                <div class="metric-row">
+                    <div class="metric">
+                        <span class="label">Compute (SM)</span>
+                        <div class="bar-container">
+                            <div class="bar" style="width: {gpu_util}%; background-color: {util_color};"></div>
+                        </div>
+                        <span class="value">{gpu_util}%</span>
+                    </div>
+                    <div class="metric">
+                        <span class="label">Memory BW</span>
+                        <div class="bar-container">
+                            <div class="bar" style="width: {mem_util}%; background-color: #3498db;"></div>
+                        </div>
+                        <span class="value">{mem_util}%</span>
+                    </div>
+                </div>
+                <div class="details">
+                    <p>💾 VRAM: <b>{mem_used:.1f}</b> / {mem_total:.1f} GB</p>
+                    <p>⚡ Power: <b>{power_watts:.0f} W</b></p>
+                    <p>↔️ PCIe: TX {pcie_tx:.0f} MB/s | RX {pcie_rx:.0f} MB/s</p>
+                </div>
+            </div>
+""".format_map
+
+def accepts_gzip(accept_encoding):
+    """Whether an Accept-Encoding header allows gzip, honoring q=0 refusals."""
+    qualities = {}
+    for token in accept_encoding.split(','):
+        coding, *params = token.split(';')
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        qualities[coding.strip().lower()] = q
+    # An explicit gzip entry overrides the wildcard
+    return qualities.get('gzip', qualities.get('*', 0.0)) > 0
+
+class DashboardHandler(BaseHTTPRequestHandler):
+    # Keep connections alive between auto-refreshes and scrapes; idle ones
+    # are dropped after the timeout so they don't pin a server thread.
+    protocol_version = 'HTTP/1.1'
+    timeout = 30
+
+    html_header = HTML_HEADER.format(refresh=1).encode('utf-8')
+    html_footer = HTML_FOOTER.format(refresh=1).encode('utf-8')
+
+    # Set while the CLI frame is drawn in place; access log lines would corrupt it
+    quiet = False
+
+    def log_request(self, code='-', size='-'):
+        # Errors still go through log_error
+        if not self.quiet:
+            super().log_request(code, size)
+
+    def do_GET(self):
+        use_gzip = accepts_gzip(self.headers.get('Accept-Encoding', ''))
+        version, batch, exposition = _SNAPSHOT[0]
+        if self.path == '/metrics':
+            # Rendered once per sample tick by the sampler; every scrape shares it
+            if use_gzip:
+                body = self.gzip_cached(version, lambda: exposition)
+            else:
+                body = exposition
+            self.send_body('text/plain', body, use_gzip)
+        elif self.path == '/':
+            if use_gzip:
+                body = self.gzip_cached(version, lambda: self.get_html(batch))
+            else:
+                body = self.get_html(batch)
+            self.send_body('text/html', body, use_gzip)
+        else:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+    def send_body(self, content_type, body, gzipped):
+        self.send_response(200)
+        self.send_header('Content-type', content_type)
+        self.send_header('Vary', 'Accept-Encoding')
+        if gzipped:
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def get_html(self, batch):
+        # Simple HTML Dashboard with auto-refresh
+        parts = [self.html_header]
+        for m in batch:
+            # Color coding for utilization
+            util_color = "red" if m['gpu_util'] > 90 else "green" if m['gpu_util'] < 50 else "orange"
+            # Names can come from remote exporters, so never trust them as markup
+            card = dict(m, util_color=util_color, name=html.escape(m['name']))
+            parts.append(_CARD_TEMPLATE(card).encode('utf-8'))
+        parts.append(self.html_footer)
+        return b"".join(parts)
+
+    def gzip_cached(self, version, render):
+        # Clients hitting the same path within one sample tick share the compressed body
+        cached_version, body = _GZIP_CACHE.get(self.path, (None, b''))
+        if cached_version != version:
+            body = gzip.compress(render(), compresslevel=1)
+            _GZIP_CACHE[self.path] = (version, body)
+        return body
+
+def render_cli(lines):
+    """Draw a CLI frame, rewriting only the terminal rows that changed."""
+    out = [] if _PREV_LINES else ["\033[2J"]
+    for row, line in enumerate(lines, 1):
+        if row > len(_PREV_LINES) or _PREV_LINES[row - 1] != line:
+            out.append(f"\033[{row};1H\033[2K{line}")
+    # Blank rows left over from a longer previous frame
+    for row in range(len(lines) + 1, len(_PREV_LINES) + 1):
+        out.append(f"\033[{row};1H\033[2K")
+    out.append(f"\033[{len(lines) + 1};1H")
+    # One unbuffered write per frame, bypassing the TextIOWrapper
+    frame = memoryview("".join(out).encode('utf-8'))
+    fd = sys.stdout.fileno()
+    while frame:
+        frame = frame[os.write(fd, frame):]
+    _PREV_LINES[:] = lines
+
+def remote_poll_loop(endpoints, interval, stop):
+    """Scrape remote exporters on their own thread so slow hosts never delay local sampling."""
+    loop = asyncio.new_event_loop()
+    # Hosts are polled together, so a round waits at most one timeout
+    timeout = min(2.0, interval)
+    try:
+        while not stop.is_set():
+            started = time.monotonic()
+            _REMOTE_BATCH[0] = loop.run_until_complete(fetch_all_remote(endpoints, timeout))
+            stop.wait(max(0, interval - (time.monotonic() - started)))
+    finally:
+        loop.close()
+
+def sampler_loop(devices, mock_mode, interval, pcie_interval, stop):
+    """Poll every device, update Prometheus and publish a new snapshot."""
+    # Bind label values once so each tick is a plain .set() per gauge
+    gauges_per_gpu = {}
+    for i, _, name in devices:
+        exported = dict(GAUGES, **GPM_GAUGES) if i in _GPM_SAMPLES else GAUGES
+        gauges_per_gpu[i] = {key: gauge.labels(i, name) for key, gauge in exported.items()}
+    # Local alias for the per-device call in the hot loop
+    read_metrics = get_real_metrics
+    tick = 0
+    version = 0
+    # Slow metrics (PCIe throughput) are refreshed every `slow_every` samples
+    slow_every = max(1, round(pcie_interval / interval))
+    # Absolute monotonic deadlines, so sampling work never accumulates drift
+    next_deadline = time.monotonic()
+    while not stop.is_set():
+        try:
+            current_batch = []
+
+            if mock_mode:
+                samples = get_mock_batch(len(devices), tick)
+            else:
+                poll_slow = version % slow_every == 0
+                samples = [read_metrics(i, handle, poll_slow) for i, handle, _ in devices]
+
+            for (i, handle, name), metrics in zip(devices, samples):
+                if metrics:
+                    # Update Prometheus
+                    for key, gauge in gauges_per_gpu[i].items():
+                        if key in metrics:
+                            gauge.set(metrics[key])
+
+                    # Store for UI
+                    metrics['name'] = name
+                    metrics['index'] = i
+                    current_batch.append(metrics)
 
-def monitor_loop(mock_mode=False, port=8000):
-    """Main loop: Update metrics & global state."""
+            # Latest remote GPUs, shown on the dashboard and CLI only; Prometheus
+            # scrapes each host directly
+            current_batch.extend(_REMOTE_BATCH[0])
+
+            version += 1
+            _SNAPSHOT[0] = (version, current_batch, generate_latest())
+        except Exception as e:
+            # Keep sampling; a bug in one tick shouldn't freeze the exporter
+            print(f"⚠️  Sampling failed ({e!r}); retrying next tick", file=sys.stderr)
+        tick += 0.5 * interval
+        next_deadline += interval
+        sleep_for = next_deadline - time.monotonic()
+        if sleep_for > 0:
+            stop.wait(sleep_for)
+        else:
+            # Overran a whole period; resync instead of bursting to catch up
+            next_deadline = time.monotonic()
+
+def monitor_loop(mock_mode=False, port=8000, interval=1.0, mock_gpus=1, pcie_interval=5.0,
+                 remote_endpoints=()):
+    """Main loop: Start sampling in the background & render the CLI."""
     
     # Start Custom HTTP Server (Handles both UI and Metrics)
-    server = HTTPServer(('0.0.0.0', port), DashboardHandler)
+    server = ThreadingHTTPServer(('0.0.0.0', port), DashboardHandler)
     thread = threading.Thread(target=server.serve_forever)
     thread.daemon = True
     thread.start()
     
+    refresh = max(1, math.ceil(interval))
+    DashboardHandler.html_header = HTML_HEADER.format(refresh=refresh).encode('utf-8')
+    DashboardHandler.html_footer = HTML_FOOTER.format(refresh=refresh).encode('utf-8')
+
     print(f"🚀 Dashboard running at http://localhost:{port}")
     print(f"📊 Prometheus metrics at http://localhost:{port}/metrics")
     
-    device_count = 1 if mock_mode else nvmlDeviceGetCount()
-    tick = 0
-    global LATEST_METRICS
+    # Handles and names never change for the process lifetime; look them up once
+    if mock_mode:
+        devices = [(i, None, "NVIDIA H100 (Simulated)") for i in range(mock_gpus)]
+    else:
+        devices = []
+        for i in range(nvmlDeviceGetCount()):
+            handle = nvmlDeviceGetHandleByIndex(i)
+            devices.append((i, handle, nvmlDeviceGetName(handle).decode('utf-8')))
+            setup_gpm(i, handle)
 
-    try:
-        while True:
-            # Clear CLI screen
-            print("\033[2J\033[H", end="")
-            print(f"--- GPU Pulse (Mode: {'MOCK' if mock_mode else 'REAL'}) ---")
-            
-            current_batch = []
-            
-            for i in range(device_count):
-                if mock_mode:
-                    name = "NVIDIA H100 (Simulated)"
-                    metrics = get_mock_metrics(i, tick)
-                else:
-                    handle = nvmlDeviceGetHandleByIndex(i)
-                    name = nvmlDeviceGetName(handle).decode('utf-8')
-                    metrics = get_real_metrics(handle)
+    # Sample on a dedicated thread so NVML latency never blocks HTTP or the CLI
+    stop = threading.Event()
+    sampler = threading.Thread(target=sampler_loop, args=(devices, mock_mode, interval, pcie_interval, stop))
+    sampler.daemon = True
+    sampler.start()
 
-                if metrics:
-                    # Update Prometheus
-                    GPU_UTIL.labels(i, name).set(metrics['gpu_util'])
-                    MEM_UTIL.labels(i, name).set(metrics['mem_util'])
-                    MEM_USED.labels(i, name).set(metrics['mem_used'])
-                    POWER_WATTS.labels(i, name).set(metrics['power_watts'])
-                    PCIE_TX.labels(i, name).set(metrics['pcie_tx'])
-                    PCIE_RX.labels(i, name).set(metrics['pcie_rx'])
-                    
-                    # Store for UI
-                    metrics['name'] = name
-                    metrics['index'] = i
-                    current_batch.append(metrics)
+    remote = None
+    if remote_endpoints:
+        remote = threading.Thread(target=remote_poll_loop, args=(remote_endpoints, interval, stop))
+        remote.daemon = True
+        remote.start()
 
-                    # CLI Output
-                    print(f"\nGPU [{i}]: {name}")
-                    print(f"  ├── 🧠 SM Util:      {metrics['gpu_util']:>3}%")
-                    print(f"  ├── 💾 Mem Util:     {metrics['mem_util']:>3}%")
-                    print(f"  └── ⚡ Power:        {metrics['power_watts']:.0f} W")
+    DashboardHandler.quiet = _TTY
+    header = _CLI_HEADER % ('MOCK' if mock_mode else 'REAL')
 
-            LATEST_METRICS = current_batch
-            tick += 0.5
-            time.sleep(1.0)
+    try:
+        while True:
+            if _TTY:
+                lines = [header]
+                _, batch, _ = _SNAPSHOT[0]
+                for m in batch:
+                    lines.extend((_CLI_GPU_TMPL % (
+                        m['index'], m['name'], m['gpu_util'], m['mem_util'], m['power_watts']
+                    )).split("\n"))
+                render_cli(lines)
+
+            time.sleep(interval)
             
     except KeyboardInterrupt:
         print("\n🛑 Stopping...")
+        stop.set()
+        sampler.join()
+        if remote:
+            remote.join()
         server.shutdown()
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="GPU Pulse: NVIDIA GPU monitor & Prometheus exporter.")
+    parser.add_argument('--interval', type=float,
+                        default=os.environ.get('GPU_POLL_INTERVAL_SECONDS', '2.0'),
+                        help="Seconds between samples (default: $GPU_POLL_INTERVAL_SECONDS or 2.0)")
+    parser.add_argument('--pcie-interval', type=float, default=5.0,
+                        help="Seconds between PCIe throughput reads on GPUs without PCIe byte counters (default: 5.0)")
+    parser.add_argument('--port', type=int, default=8000,
+                        help="Port for the dashboard and /metrics (default: 8000)")
+    parser.add_argument('--remote-nvml-endpoints', nargs='+', default=[], metavar='URL',
+                        help="/metrics URLs of other gpu-pulse exporters to show alongside local GPUs")
+    parser.add_argument('--mock', action='store_true',
+                        help="Run in Mock Mode even if a GPU is available")
+    parser.add_argument('--mock-gpus', type=int, default=1,
+                        help="Number of simulated GPUs in Mock Mode (default: 1)")
+    args = parser.parse_args(argv)
+    if args.interval <= 0 or args.pcie_interval <= 0:
+        parser.error("--interval and --pcie-interval must be positive")
+    return args
+
 if __name__ == "__main__":
-    if check_nvidia_driver():
+    args = parse_args()
+    if not args.mock and check_nvidia_driver():
         print("✅ NVIDIA Driver detected. Running in REAL mode.")
-        monitor_loop(mock_mode=False)
+        monitor_loop(mock_mode=False, port=args.port, interval=args.interval,
+                     pcie_interval=args.pcie_interval,
+                     remote_endpoints=args.remote_nvml_endpoints)
+        free_gpm_samples()
         nvmlShutdown()
     else:
-        print("⚠️  No NVIDIA GPU detected. Running in MOCK mode.")
-        time.sleep(2)
-        monitor_loop(mock_mode=True)
+        if not args.mock:
+            print("⚠️  No NVIDIA GPU detected. Running in MOCK mode.")
+            time.sleep(2)
+        monitor_loop(mock_mode=True, port=args.port, interval=args.interval,
+                     mock_gpus=args.mock_gpus,
+                     remote_endpoints=args.remote_nvml_endpoints)